@@ -6,19 +6,45 @@ Simulates API endpoints for scraped material data (Bonus Feature)
 
 from fastapi import FastAPI, HTTPException, Query, Path
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import json
+from fastapi.responses import Response
+import importlib.util
+import numpy as np
+import orjson
 import logging
+import os
 from typing import List, Dict, Optional, Any
 from datetime import datetime
 from pathlib import Path as PathLib
 import uvicorn
 from pydantic import BaseModel, Field
+import msgspec
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# in_stock column codes; values other than True/False never match the filter
+_STOCK_CODES = {True: 1, False: 0}
+
+def _dictionary_encode(values: List[Any]) -> tuple[np.ndarray, Dict[Any, int]]:
+    """Encode values as integer codes plus a value -> code vocabulary"""
+    vocab: Dict[Any, int] = {}
+    codes = np.fromiter(
+        (vocab.setdefault(v, len(vocab)) for v in values), dtype=np.int32, count=len(values)
+    )
+    return codes, vocab
+
+def _trigrams(text: str) -> set:
+    """Distinct character trigrams of text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class ORJSONResponse(Response):
+    """JSON response rendered with orjson instead of the stdlib encoder"""
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str)
+
 # Pydantic models for API responses
 class ProductResponse(BaseModel):
     name: str
@@ -64,6 +90,32 @@ class StatsResponse(BaseModel):
     price_range: Dict[str, float]
     last_updated: str
 
+# msgspec structs used to decode and validate the data file in a single pass;
+# ProductRecord mirrors ProductResponse
+class ProductRecord(msgspec.Struct, kw_only=True, gc=False):
+    name: str
+    category: str
+    price: float
+    currency: str = "EUR"
+    product_url: str
+    brand: Optional[str] = None
+    unit: Optional[str] = None
+    pack_size: Optional[str] = None
+    image_url: Optional[str] = None
+    in_stock: bool = True
+    supplier: str
+    scraped_at: str
+
+class MaterialsFile(msgspec.Struct):
+    scraped_at: str = ""
+    total_products: int = 0
+    products: List[msgspec.Raw] = []
+
+_materials_decoder = msgspec.json.Decoder(MaterialsFile)
+# Lax mode coerces the same way the Pydantic models did (e.g. "12.5" -> 12.5,
+# "false" -> False) instead of dropping such rows
+_product_decoder = msgspec.json.Decoder(ProductRecord, strict=False)
+
 class DonizoAPI:
     """API class for serving scraped material data"""
     
@@ -74,26 +126,179 @@ class DonizoAPI:
             description="API for renovation material pricing data scraped from French suppliers",
             version="1.0.0",
             docs_url="/docs",
-            redoc_url="/redoc"
+            redoc_url="/redoc",
+            default_response_class=ORJSONResponse
         )
-        self.data = self._load_data()
+        self._reload()
         self._setup_middleware()
         self._setup_routes()
     
+    def _reload(self):
+        """Load the data file and rebuild everything derived from it"""
+        self.data = self._load_data()
+        self._build_indexes()
+        self._last_refresh_iso = datetime.now().isoformat()
+    
     def _load_data(self) -> Dict[str, Any]:
         """Load scraped data from JSON file"""
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                logger.info(f"Loaded {data.get('total_products', 0)} products from {self.data_file}")
-                return data
+            # Read into memory rather than mmap: a file truncated mid-decode would
+            # raise SIGBUS instead of a catchable DecodeError
+            with open(self.data_file, 'rb') as f:
+                materials = _materials_decoder.decode(f.read())
+            products = self._validate_products(materials.products)
+            # Count what is served, not the file header, which includes skipped rows
+            data = {
+                "scraped_at": materials.scraped_at,
+                "total_products": len(products),
+                "products": products
+            }
+            logger.info(f"Loaded {data['total_products']} products from {self.data_file}")
+            return data
         except FileNotFoundError:
             logger.warning(f"Data file {self.data_file} not found, using empty dataset")
             return {"products": [], "total_products": 0, "scraped_at": datetime.now().isoformat()}
-        except json.JSONDecodeError as e:
+        except msgspec.DecodeError as e:
             logger.error(f"Error parsing JSON data: {e}")
             return {"products": [], "total_products": 0, "scraped_at": datetime.now().isoformat()}
     
+    def _validate_products(self, products: List[msgspec.Raw]) -> List[Dict[str, Any]]:
+        """Validate raw product entries against ProductRecord once, at load time
+        
+        Routes serialize the returned dicts directly, so this is where schema
+        defaults are filled in and unknown fields are dropped.
+        """
+        validated = []
+        for raw in products:
+            try:
+                validated.append(_product_decoder.decode(raw))
+            except msgspec.ValidationError as e:
+                logger.warning(f"Skipping invalid product: {e}")
+        return msgspec.to_builtins(validated)
+    
+    def _build_indexes(self):
+        """Precompute filter indexes and category, supplier and stats aggregates
+        
+        The dataset only changes on load/refresh, so the aggregate endpoints are
+        cached here as serialized JSON instead of rescanning products per request.
+        """
+        products = self.data.get("products", [])
+        last_updated = self.data.get("scraped_at", "")
+        
+        # Struct-of-arrays view of the products used by the /materials filters.
+        # Categorical fields are dictionary-encoded on their lowercased value so
+        # equality filters become integer comparisons over a single column.
+        self._cols: Dict[str, Any] = {
+            "price": np.fromiter(
+                (p.get("price", 0) for p in products), dtype=np.float64, count=len(products)
+            ),
+            "in_stock": np.fromiter(
+                (_STOCK_CODES.get(p.get("in_stock", True), -1) for p in products),
+                dtype=np.int8, count=len(products)
+            ),
+            "name_lower": [p.get("name", "").lower() for p in products],
+        }
+        self._vocab: Dict[str, Dict[str, int]] = {}
+        for field in ("category", "supplier", "brand"):
+            self._cols[field], self._vocab[field] = _dictionary_encode(
+                [(p.get(field) or "").lower() for p in products]
+            )
+        
+        # Trigram inverted index over lowercased names; rows are appended in
+        # order, so every posting list is sorted and unique
+        trigrams: Dict[str, List[int]] = {}
+        for i, name in enumerate(self._cols["name_lower"]):
+            for trigram in _trigrams(name):
+                trigrams.setdefault(trigram, []).append(i)
+        self._trigrams = {t: np.array(rows, dtype=np.intp) for t, rows in trigrams.items()}
+        
+        categories = {}
+        suppliers = {}
+        prices = []
+        
+        for product in products:
+            cat = product.get("category", "unknown")
+            sup = product.get("supplier", "unknown")
+            price = product.get("price", 0)
+            
+            if cat not in categories:
+                categories[cat] = {"count": 0, "prices": [], "suppliers": set()}
+            categories[cat]["count"] += 1
+            categories[cat]["suppliers"].add(sup)
+            
+            if sup not in suppliers:
+                suppliers[sup] = {"count": 0, "prices": [], "categories": set()}
+            suppliers[sup]["count"] += 1
+            suppliers[sup]["categories"].add(cat)
+            
+            if price > 0:
+                categories[cat]["prices"].append(price)
+                suppliers[sup]["prices"].append(price)
+                prices.append(price)
+        
+        category_stats = []
+        for cat_name, cat_data in categories.items():
+            cat_prices = cat_data["prices"]
+            category_stats.append({
+                "name": cat_name,
+                "product_count": cat_data["count"],
+                "average_price": float(sum(cat_prices) / len(cat_prices)) if cat_prices else 0.0,
+                "price_range": {
+                    "min": float(min(cat_prices)) if cat_prices else 0.0,
+                    "max": float(max(cat_prices)) if cat_prices else 0.0
+                },
+                "suppliers": list(cat_data["suppliers"])
+            })
+        category_stats.sort(key=lambda x: x["product_count"], reverse=True)
+        
+        supplier_stats = []
+        for sup_name, sup_data in suppliers.items():
+            sup_prices = sup_data["prices"]
+            supplier_stats.append({
+                "name": sup_name,
+                "product_count": sup_data["count"],
+                "categories": list(sup_data["categories"]),
+                "average_price": float(sum(sup_prices) / len(sup_prices)) if sup_prices else 0.0,
+                "last_updated": last_updated
+            })
+        supplier_stats.sort(key=lambda x: x["product_count"], reverse=True)
+        
+        stats = {
+            "total_products": len(products),
+            "total_suppliers": len(suppliers),
+            "total_categories": len(categories),
+            "average_price": float(sum(prices) / len(prices)) if prices else 0.0,
+            "price_range": {
+                "min": float(min(prices)) if prices else 0.0,
+                "max": float(max(prices)) if prices else 0.0
+            },
+            "last_updated": last_updated
+        }
+        
+        self._categories_cache = orjson.dumps(category_stats)
+        self._suppliers_cache = orjson.dumps(supplier_stats)
+        self._stats_cache = orjson.dumps(stats)
+    
+    def _trigram_candidates(self, needle: str) -> np.ndarray:
+        """Rows whose name contains every trigram of needle (len(needle) >= 3)"""
+        postings = []
+        for trigram in _trigrams(needle):
+            rows = self._trigrams.get(trigram)
+            if rows is None:
+                return np.empty(0, dtype=np.intp)
+            postings.append(rows)
+        
+        # Intersect starting from the most selective posting list
+        postings.sort(key=len)
+        candidates = postings[0]
+        for rows in postings[1:]:
+            candidates = np.intersect1d(candidates, rows, assume_unique=True)
+        return candidates
+    
+    def _matching_codes(self, field: str, needle: str) -> List[int]:
+        """Codes of every vocabulary value of field containing needle"""
+        return [code for value, code in self._vocab[field].items() if needle in value]
+    
     def _setup_middleware(self):
         """Setup CORS middleware"""
         self.app.add_middleware(
@@ -107,7 +312,7 @@ class DonizoAPI:
     def _setup_routes(self):
         """Setup API routes"""
         
-        @self.app.get("/", response_class=JSONResponse)
+        @self.app.get("/")
         async def root():
             """API root endpoint"""
             return {
@@ -124,7 +329,7 @@ class DonizoAPI:
                 }
             }
         
-        @self.app.get("/materials", response_model=MaterialsResponse)
+        @self.app.get("/materials", responses={200: {"model": MaterialsResponse}})
         async def get_materials(
             page: int = Query(1, ge=1, description="Page number"),
             per_page: int = Query(20, ge=1, le=100, description="Items per page"),
@@ -139,156 +344,100 @@ class DonizoAPI:
             """Get materials with filtering and pagination"""
             products = self.data.get("products", [])
             
-            # Apply filters
+            # Filters sweep the load-time columns; product dicts are only
+            # touched for the final page
+            cols = self._cols
+            mask = np.ones(len(products), dtype=bool)
             filters_applied = {}
             
+            # Columns hold lowercased values, so each query value is lowered once here
+            category_lc = category.lower() if category else None
+            supplier_lc = supplier.lower() if supplier else None
+            brand_lc = brand.lower() if brand else None
+            search_lc = search.lower() if search else None
+            
             if category:
-                products = [p for p in products if p.get("category", "").lower() == category.lower()]
+                mask &= cols["category"] == self._vocab["category"].get(category_lc, -1)
                 filters_applied["category"] = category
             
             if supplier:
-                products = [p for p in products if supplier.lower() in p.get("supplier", "").lower()]
+                mask &= np.isin(cols["supplier"], self._matching_codes("supplier", supplier_lc))
                 filters_applied["supplier"] = supplier
             
             if min_price is not None:
-                products = [p for p in products if p.get("price", 0) >= min_price]
+                mask &= cols["price"] >= min_price
                 filters_applied["min_price"] = min_price
             
             if max_price is not None:
-                products = [p for p in products if p.get("price", 0) <= max_price]
+                mask &= cols["price"] <= max_price
                 filters_applied["max_price"] = max_price
             
             if brand:
-                products = [p for p in products if brand.lower() in (p.get("brand") or "").lower()]
+                mask &= np.isin(cols["brand"], self._matching_codes("brand", brand_lc))
                 filters_applied["brand"] = brand
             
             if in_stock is not None:
-                products = [p for p in products if p.get("in_stock", True) == in_stock]
+                mask &= cols["in_stock"] == _STOCK_CODES[in_stock]
                 filters_applied["in_stock"] = in_stock
             
             if search:
-                search_lower = search.lower()
-                products = [p for p in products if search_lower in p.get("name", "").lower()]
                 filters_applied["search"] = search
             
+            # Rows must contain every trigram of the query to contain the query
+            if search and len(search_lc) >= 3:
+                search_mask = np.zeros(len(products), dtype=bool)
+                search_mask[self._trigram_candidates(search_lc)] = True
+                mask &= search_mask
+            
+            indices = np.flatnonzero(mask)
+            
+            # Exact substring check only runs over the already reduced candidate set
+            if search:
+                names_lower = cols["name_lower"]
+                indices = [i for i in indices if search_lc in names_lower[i]]
+            
             # Pagination
-            total = len(products)
+            total = len(indices)
             total_pages = (total + per_page - 1) // per_page
             start = (page - 1) * per_page
             end = start + per_page
-            paginated_products = products[start:end]
+            paginated_products = [products[i] for i in indices[start:end]]
             
-            return MaterialsResponse(
-                total=total,
-                page=page,
-                per_page=per_page,
-                total_pages=total_pages,
-                products=[ProductResponse(**p) for p in paginated_products],
-                filters_applied=filters_applied
-            )
+            return ORJSONResponse({
+                "total": total,
+                "page": page,
+                "per_page": per_page,
+                "total_pages": total_pages,
+                "products": paginated_products,
+                "filters_applied": filters_applied
+            })
         
-        @self.app.get("/materials/{category}", response_model=MaterialsResponse)
+        @self.app.get("/materials/{category}", responses={200: {"model": MaterialsResponse}})
         async def get_materials_by_category(
             category: str = Path(..., description="Category name"),
             page: int = Query(1, ge=1),
             per_page: int = Query(20, ge=1, le=100)
         ):
             """Get materials by specific category"""
-            return await get_materials(page=page, per_page=per_page, category=category)
+            return await get_materials(
+                page=page, per_page=per_page, category=category, supplier=None,
+                min_price=None, max_price=None, brand=None, in_stock=None, search=None
+            )
         
-        @self.app.get("/categories", response_model=List[CategoryResponse])
+        @self.app.get("/categories", responses={200: {"model": List[CategoryResponse]}})
         async def get_categories():
             """Get all categories with statistics"""
-            products = self.data.get("products", [])
-            categories = {}
-            
-            for product in products:
-                cat = product.get("category", "unknown")
-                if cat not in categories:
-                    categories[cat] = {
-                        "products": [],
-                        "suppliers": set()
-                    }
-                categories[cat]["products"].append(product)
-                categories[cat]["suppliers"].add(product.get("supplier", "unknown"))
-            
-            result = []
-            for cat_name, cat_data in categories.items():
-                prices = [p.get("price", 0) for p in cat_data["products"] if p.get("price", 0) > 0]
-                
-                result.append(CategoryResponse(
-                    name=cat_name,
-                    product_count=len(cat_data["products"]),
-                    average_price=sum(prices) / len(prices) if prices else 0,
-                    price_range={
-                        "min": min(prices) if prices else 0,
-                        "max": max(prices) if prices else 0
-                    },
-                    suppliers=list(cat_data["suppliers"])
-                ))
-            
-            return sorted(result, key=lambda x: x.product_count, reverse=True)
+            return Response(content=self._categories_cache, media_type="application/json")
         
-        @self.app.get("/suppliers", response_model=List[SupplierResponse])
+        @self.app.get("/suppliers", responses={200: {"model": List[SupplierResponse]}})
         async def get_suppliers():
             """Get all suppliers with statistics"""
-            products = self.data.get("products", [])
-            suppliers = {}
-            
-            for product in products:
-                sup = product.get("supplier", "unknown")
-                if sup not in suppliers:
-                    suppliers[sup] = {
-                        "products": [],
-                        "categories": set()
-                    }
-                suppliers[sup]["products"].append(product)
-                suppliers[sup]["categories"].add(product.get("category", "unknown"))
-            
-            result = []
-            for sup_name, sup_data in suppliers.items():
-                prices = [p.get("price", 0) for p in sup_data["products"] if p.get("price", 0) > 0]
-                
-                result.append(SupplierResponse(
-                    name=sup_name,
-                    product_count=len(sup_data["products"]),
-                    categories=list(sup_data["categories"]),
-                    average_price=sum(prices) / len(prices) if prices else 0,
-                    last_updated=self.data.get("scraped_at", "")
-                ))
-            
-            return sorted(result, key=lambda x: x.product_count, reverse=True)
+            return Response(content=self._suppliers_cache, media_type="application/json")
         
-        @self.app.get("/stats", response_model=StatsResponse)
+        @self.app.get("/stats", responses={200: {"model": StatsResponse}})
         async def get_stats():
             """Get overall statistics"""
-            products = self.data.get("products", [])
-            
-            if not products:
-                return StatsResponse(
-                    total_products=0,
-                    total_suppliers=0,
-                    total_categories=0,
-                    average_price=0,
-                    price_range={"min": 0, "max": 0},
-                    last_updated=self.data.get("scraped_at", "")
-                )
-            
-            prices = [p.get("price", 0) for p in products if p.get("price", 0) > 0]
-            suppliers = set(p.get("supplier", "unknown") for p in products)
-            categories = set(p.get("category", "unknown") for p in products)
-            
-            return StatsResponse(
-                total_products=len(products),
-                total_suppliers=len(suppliers),
-                total_categories=len(categories),
-                average_price=sum(prices) / len(prices) if prices else 0,
-                price_range={
-                    "min": min(prices) if prices else 0,
-                    "max": max(prices) if prices else 0
-                },
-                last_updated=self.data.get("scraped_at", "")
-            )
+            return Response(content=self._stats_cache, media_type="application/json")
         
         @self.app.get("/health")
         async def health_check():
@@ -303,16 +452,18 @@ class DonizoAPI:
         @self.app.post("/refresh")
         async def refresh_data():
             """Refresh data from file"""
-            self.data = self._load_data()
+            self._reload()
             return {
                 "status": "refreshed",
                 "products_loaded": self.data.get("total_products", 0),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": self._last_refresh_iso
             }
 
-def create_app(data_file: str = "data/materials.json") -> FastAPI:
+def create_app(data_file: Optional[str] = None) -> FastAPI:
     """Factory function to create FastAPI app"""
-    donizo_api = DonizoAPI(data_file)
+    # Uvicorn workers call the factory without arguments, so main() hands the
+    # data file over through the environment
+    donizo_api = DonizoAPI(data_file or os.environ.get("DONIZO_DATA_FILE", "data/materials.json"))
     return donizo_api.app
 
 def main():
@@ -324,6 +475,8 @@ def main():
     parser.add_argument("--port", type=int, default=8000, help="Port to bind to")
     parser.add_argument("--data-file", default="data/materials.json", help="Path to data file")
     parser.add_argument("--reload", action="store_true", help="Enable auto-reload")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Number of worker processes (default: 2 * CPU count + 1)")
     
     args = parser.parse_args()
     
@@ -332,20 +485,31 @@ def main():
         logger.warning(f"Data file {args.data_file} not found. API will serve empty dataset.")
         logger.info("Run the scraper first: python scraper.py")
     
-    # Create and run the app
-    app = create_app(args.data_file)
+    os.environ["DONIZO_DATA_FILE"] = args.data_file
+    
+    # Auto-reload only supports a single process
+    if args.reload:
+        workers = 1
+    else:
+        workers = args.workers or 2 * (os.cpu_count() or 1) + 1
     
-    logger.info(f"Starting Donizo API server on {args.host}:{args.port}")
+    logger.info(f"Starting Donizo API server on {args.host}:{args.port} with {workers} worker(s)")
     logger.info(f"API docs available at: http://{args.host}:{args.port}/docs")
     
+    # Each worker loads its own copy of the data, so /refresh only reloads the
+    # worker that handles the request
     uvicorn.run(
         "api_server:create_app",
         host=args.host,
         port=args.port,
         reload=args.reload,
+        workers=workers,
         factory=True,
         app_dir=".",
-        log_level="info"
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "auto",
+        http="httptools" if importlib.util.find_spec("httptools") else "auto",
+        log_level="warning",
+        access_log=False
     )
 
 if __name__ == "__main__":
@@ -6,24 +6,94 @@ Scrapes renovation material pricing data from French suppliers
 
 import asyncio
 import aiohttp
+import copy
+import functools
+import importlib.util
 import json
+import numpy as np
 import yaml
 import logging
+import os
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 import random
 import re
+import sys
+import tempfile
+
+try:
+    import orjson
+except ImportError:  # optional speedup, save_data falls back to json
+    orjson = None
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Prefer the LibYAML-backed loader when PyYAML was built with it
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Only advertise Brotli when aiohttp has a decoder for it
+if importlib.util.find_spec('brotli') or importlib.util.find_spec('brotlicffi'):
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+else:
+    _ACCEPT_ENCODING = 'gzip, deflate'
+
+# Request headers shared by every session, built once at import
+HEADERS = (
+    ('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'),
+    ('Accept', 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8'),
+    ('Accept-Language', 'fr-FR,fr;q=0.9,en;q=0.8'),
+    ('Accept-Encoding', _ACCEPT_ENCODING),
+    ('DNT', '1'),
+    ('Connection', 'keep-alive'),
+    ('Upgrade-Insecure-Requests', '1'),
+)
+
+# Patterns used while parsing product pages, compiled once at import
+_PRODUCT_CLASS_RE = re.compile(r'product|item|card', re.I)
+_TITLE_CLASS_RE = re.compile(r'title|name|product', re.I)
+_PRICE_CLASS_RE = re.compile(r'price|prix', re.I)
+_PRICE_TEXT_RE = re.compile(r'€|\d+[,.]?\d*')
+_BRAND_CLASS_RE = re.compile(r'brand|marque', re.I)
+_STOCK_CLASS_RE = re.compile(r'stock|disponib', re.I)
+_PRICE_CLEAN_RE = re.compile(r'[^\d,.]')
+
+# Common units in French, in match priority order. A unit only matches when it
+# is not glued to other letters (so the "l" in "Carrelage" is not litres), and
+# word units also match their plural ("5 pièces").
+_UNITS = ['m²', 'm2', 'cm²', 'cm2', 'ml', 'cl', 'l', 'kg', 'g', 'pièce', 'lot', 'paquet']
+_UNIT_PATTERNS = tuple(
+    (unit, re.compile(
+        r'(?<![^\W\d_])' + re.escape(unit) + ('s?' if len(unit) > 2 and unit.isalpha() else '') + r'(?![^\W\d_])',
+        re.I
+    ))
+    for unit in _UNITS
+)
+
+@functools.lru_cache(maxsize=4096)
+def _parse_price_impl(price_text: str) -> Optional[tuple[float, str]]:
+    """Parse non-empty price text into (price, currency), or None if it isn't a price
+    
+    Listings repeat the same price strings, so results are memoized.
+    """
+    # Remove whitespace and common price indicators
+    price_clean = _PRICE_CLEAN_RE.sub('', price_text.replace(',', '.'))
+    
+    try:
+        price = float(price_clean)
+    except ValueError:
+        return None
+    currency = "EUR" if "€" in price_text else "EUR"  # Default to EUR for French sites
+    return price, currency
+
+@dataclass(slots=True)
 class Product:
     """Data structure for a scraped product"""
     name: str
@@ -42,6 +112,73 @@ class Product:
     def __post_init__(self):
         if not self.scraped_at:
             self.scraped_at = datetime.now().isoformat()
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the product's fields (all scalars, so no deep copy needed)"""
+        return {
+            'name': self.name,
+            'category': self.category,
+            'price': self.price,
+            'currency': self.currency,
+            'product_url': self.product_url,
+            'brand': self.brand,
+            'unit': self.unit,
+            'pack_size': self.pack_size,
+            'image_url': self.image_url,
+            'in_stock': self.in_stock,
+            'supplier': self.supplier,
+            'scraped_at': self.scraped_at
+        }
+
+# Parsed configs keyed by absolute path, with the (mtime_ns, size) they were read at
+_CONFIG_CACHE: 'OrderedDict[str, Tuple[Tuple[int, ...], Dict]]' = OrderedDict()
+_CONFIG_CACHE_SIZE = 100
+
+def _config_sidecar(config_path: str, stat: os.stat_result) -> Optional[Tuple[str, os.stat_result]]:
+    """Return the sibling .json of a YAML config and its stat, if it is newer"""
+    json_path = os.path.splitext(config_path)[0] + '.json'
+    if json_path == config_path:
+        return None
+    try:
+        json_stat = os.stat(json_path)
+    except FileNotFoundError:
+        return None
+    if json_stat.st_mtime_ns <= stat.st_mtime_ns:
+        # The YAML was edited after (or, on coarse timestamps, in the same tick
+        # as) the JSON was generated
+        return None
+    return json_path, json_stat
+
+def _load_config_cached(config_path: str) -> Dict:
+    """Load a YAML config, reusing the parsed result while the file is unchanged
+    
+    A sibling .json that is strictly newer than the YAML (e.g. written by a
+    build step) is read instead, since JSON parses much faster than YAML.
+    Callers get a deep copy, so mutating a returned config never leaks into
+    the cache.
+    """
+    stat = os.stat(config_path)
+    key = os.path.abspath(config_path)
+    sidecar = _config_sidecar(config_path, stat)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if sidecar is not None:
+        signature += (sidecar[1].st_mtime_ns, sidecar[1].st_size)
+    
+    cached = _CONFIG_CACHE.get(key)
+    if cached is None or cached[0] != signature:
+        if sidecar is not None:
+            with open(sidecar[0], 'rb') as f:
+                config = orjson.loads(f.read()) if orjson is not None else json.load(f)
+        else:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = yaml.load(f, Loader=_YamlLoader)
+        cached = (signature, config)
+        _CONFIG_CACHE[key] = cached
+        if len(_CONFIG_CACHE) > _CONFIG_CACHE_SIZE:
+            _CONFIG_CACHE.popitem(last=False)
+    _CONFIG_CACHE.move_to_end(key)
+    
+    return copy.deepcopy(cached[1])
 
 class MaterialScraper:
     """Main scraper class for renovation materials"""
@@ -49,22 +186,20 @@ class MaterialScraper:
     def __init__(self, config_path: str = "config/scraper_config.yaml"):
         self.config = self._load_config(config_path)
         self.session: Optional[aiohttp.ClientSession] = None
+        self._connector: Optional[aiohttp.TCPConnector] = None
         self.products: List[Product] = []
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'fr-FR,fr;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        }
+        self._throttle_lock: Optional[asyncio.Lock] = None
+        # Shared scraped_at for the current scrape_all batch; empty outside a
+        # batch, in which case Product stamps itself
+        self._batch_scraped_at = ""
+        # Earliest start time for each of the max_concurrent_requests request
+        # slots, so that many requests may start per delay window
+        self._request_slots = [0.0] * max(1, self.config['scraping'].get('max_concurrent_requests', 1))
     
     def _load_config(self, config_path: str) -> Dict:
-        """Load configuration from YAML file"""
+        """Load configuration from YAML file (or its up-to-date JSON sidecar)"""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f)
+            return _load_config_cached(config_path)
         except FileNotFoundError:
             logger.warning(f"Config file {config_path} not found, using defaults")
             return self._get_default_config()
@@ -95,11 +230,22 @@ class MaterialScraper:
     
     async def __aenter__(self):
         """Async context manager entry"""
-        connector = aiohttp.TCPConnector(limit=10, limit_per_host=3)
+        self._throttle_lock = asyncio.Lock()
+        # Pool sized from the configured concurrency; idle connections are
+        # kept alive so consecutive pages reuse the same TCP/TLS connection
+        max_concurrent = self.config['scraping'].get('max_concurrent_requests', 10)
+        self._connector = aiohttp.TCPConnector(
+            limit=max_concurrent * 4,
+            limit_per_host=3,
+            keepalive_timeout=30,
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True
+        )
         timeout = aiohttp.ClientTimeout(total=30)
         self.session = aiohttp.ClientSession(
-            headers=self.headers,
-            connector=connector,
+            headers=HEADERS,
+            connector=self._connector,
             timeout=timeout
         )
         return self
@@ -108,18 +254,43 @@ class MaterialScraper:
         """Async context manager exit"""
         if self.session:
             await self.session.close()
+            self.session = None
+        if self._connector:
+            await self._connector.close()
+            self._connector = None
     
-    async def _fetch_page(self, url: str) -> Optional[str]:
-        """Fetch a single page with error handling and rate limiting"""
-        try:
-            await asyncio.sleep(random.uniform(
+    async def _throttle(self):
+        """Wait for the next request slot
+        
+        Up to max_concurrent_requests requests may start per delay window:
+        each request takes the earliest free slot, and that slot then stays
+        busy for a random delay between delay_min and delay_max. The slot is
+        reserved under the lock but waited for outside it, so requests already
+        in flight keep overlapping with the wait.
+        """
+        async with self._throttle_lock:
+            now = time.monotonic()
+            slots = self._request_slots
+            slot = min(range(len(slots)), key=slots.__getitem__)
+            start_at = max(now, slots[slot])
+            slots[slot] = start_at + random.uniform(
                 self.config['scraping']['delay_min'],
                 self.config['scraping']['delay_max']
-            ))
+            )
+        
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+    
+    async def _fetch_page(self, url: str) -> Optional[bytes]:
+        """Fetch a single page with error handling and rate limiting"""
+        try:
+            await self._throttle()
             
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    content = await response.text()
+                    # Raw bytes go straight to the HTML parser, which detects the
+                    # encoding itself, so the body is never decoded to str here
+                    content = await response.read()
                     logger.info(f"Successfully fetched: {url}")
                     return content
                 else:
@@ -134,32 +305,37 @@ class MaterialScraper:
         if not price_text:
             return 0.0, "EUR"
         
-        # Remove whitespace and common price indicators
-        price_clean = re.sub(r'[^\d,.]', '', price_text.replace(',', '.'))
-        
-        try:
-            price = float(price_clean)
-            currency = "EUR" if "€" in price_text else "EUR"  # Default to EUR for French sites
-            return price, currency
-        except ValueError:
+        parsed = _parse_price_impl(price_text)
+        if parsed is None:
+            # Logged here rather than in the cached helper so every occurrence is reported
             logger.warning(f"Could not parse price: {price_text}")
             return 0.0, "EUR"
+        return parsed
     
     def _extract_unit(self, text: str) -> Optional[str]:
         """Extract measurement unit from product text"""
         if not text:
             return None
         
-        # Common units in French
-        units = ['m²', 'm2', 'cm²', 'cm2', 'ml', 'cl', 'l', 'kg', 'g', 'pièce', 'lot', 'paquet']
-        text_lower = text.lower()
-        
-        for unit in units:
-            if unit.lower() in text_lower:
+        for unit, pattern in _UNIT_PATTERNS:
+            if pattern.search(text):
                 return unit
         
         return None
     
+    def _find_product_containers(self, content: bytes) -> list:
+        """Parse a listing page and return its product container elements"""
+        soup = BeautifulSoup(content, 'lxml')
+        
+        # Find product containers (adjust selectors based on actual HTML structure)
+        product_containers = soup.find_all(['div', 'article'], class_=_PRODUCT_CLASS_RE)
+        
+        if not product_containers:
+            # Try alternative selectors
+            product_containers = soup.find_all('div', attrs={'data-product-id': True})
+        
+        return product_containers
+    
     async def _scrape_leroymerlin_category(self, category: str, category_url: str) -> List[Product]:
         """Scrape products from Leroy Merlin category page"""
         products = []
@@ -171,42 +347,59 @@ class MaterialScraper:
         # Handle pagination
         page = 1
         max_products = self.config['scraping']['max_products_per_category']
+        max_pages = self.config['scraping'].get('max_pages_per_category', 10)
+        products_per_page = 0
+        seen_pages = set()
+        done = False
         
-        while len(products) < max_products:
-            page_url = f"{full_url}?page={page}"
-            content = await self._fetch_page(page_url)
-            
-            if not content:
-                break
-            
-            soup = BeautifulSoup(content, 'html.parser')
-            
-            # Find product containers (adjust selectors based on actual HTML structure)
-            product_containers = soup.find_all(['div', 'article'], class_=re.compile(r'product|item|card', re.I))
-            
-            if not product_containers:
-                # Try alternative selectors
-                product_containers = soup.find_all('div', attrs={'data-product-id': True})
-            
-            if not product_containers:
-                logger.warning(f"No products found on page {page} for {category}")
-                break
-            
-            page_products = 0
-            for container in product_containers[:max_products - len(products)]:
-                product = await self._parse_leroymerlin_product(container, category, base_url)
-                if product:
-                    products.append(product)
-                    page_products += 1
-            
-            if page_products == 0:
-                break
+        while not done and len(products) < max_products and page <= max_pages:
+            # Fetch the first page on its own, then speculatively fetch in parallel
+            # as many pages as its product count suggests are still needed
+            if products_per_page:
+                remaining = max_products - len(products)
+                batch_size = min(max_pages - page + 1, -(-remaining // products_per_page))
+            else:
+                batch_size = 1
             
-            page += 1
+            page_numbers = range(page, page + batch_size)
+            contents = await asyncio.gather(*[
+                self._fetch_page(f"{full_url}?page={page_number}") for page_number in page_numbers
+            ])
+            page += batch_size
             
-            # Safety break for pagination
-            if page > 10:
-                break
+            for page_number, content in zip(page_numbers, contents):
+                if not content or len(products) >= max_products:
+                    done = True
+                    break
+                
+                # Sites that ignore the page parameter keep serving the same listing
+                content_hash = hash(content)
+                if content_hash in seen_pages:
+                    logger.info(f"Page {page_number} for {category} repeats an earlier page, stopping")
+                    done = True
+                    break
+                seen_pages.add(content_hash)
+                
+                # Parsing is CPU-bound, keep it off the event loop so other fetches progress
+                product_containers = await asyncio.to_thread(self._find_product_containers, content)
+                
+                if not product_containers:
+                    logger.warning(f"No products found on page {page_number} for {category}")
+                    done = True
+                    break
+                
+                products_per_page = products_per_page or len(product_containers)
+                
+                page_products = 0
+                for container in product_containers[:max_products - len(products)]:
+                    product = await self._parse_leroymerlin_product(container, category, base_url)
+                    if product:
+                        products.append(product)
+                        page_products += 1
+                
+                if page_products == 0:
+                    done = True
+                    break
         
         logger.info(f"Scraped {len(products)} products from {category}")
         return products
@@ -215,7 +408,7 @@ class MaterialScraper:
         """Parse individual product from Leroy Merlin"""
         try:
             # Product name
-            name_elem = container.find(['h2', 'h3', 'a'], class_=re.compile(r'title|name|product', re.I))
+            name_elem = container.find(['h2', 'h3', 'a'], class_=_TITLE_CLASS_RE)
             if not name_elem:
                 name_elem = container.find('a', title=True)
             
@@ -232,17 +425,18 @@ class MaterialScraper:
             product_url = urljoin(base_url, url_elem['href'])
             
             # Price
-            price_elem = container.find(['span', 'div'], class_=re.compile(r'price|prix', re.I))
+            price_elem = container.find(['span', 'div'], class_=_PRICE_CLASS_RE)
             if not price_elem:
-                price_elem = container.find(string=re.compile(r'€|\d+[,.]?\d*'))
+                price_elem = container.find(string=_PRICE_TEXT_RE)
                 if price_elem:
                     price_elem = price_elem.parent
             
             price, currency = self._parse_price(price_elem.get_text() if price_elem else "0")
             
             # Brand
-            brand_elem = container.find(['span', 'div'], class_=re.compile(r'brand|marque', re.I))
-            brand = brand_elem.get_text(strip=True) if brand_elem else None
+            brand_elem = container.find(['span', 'div'], class_=_BRAND_CLASS_RE)
+            # Brands repeat across a listing; interning keeps one copy per distinct brand
+            brand = sys.intern(brand_elem.get_text(strip=True)) if brand_elem else None
             
             # Image URL
             img_elem = container.find('img')
@@ -256,7 +450,7 @@ class MaterialScraper:
             unit = self._extract_unit(name)
             
             # Stock status
-            stock_elem = container.find(['span', 'div'], class_=re.compile(r'stock|disponib', re.I))
+            stock_elem = container.find(['span', 'div'], class_=_STOCK_CLASS_RE)
             in_stock = True
             if stock_elem:
                 stock_text = stock_elem.get_text().lower()
@@ -272,7 +466,8 @@ class MaterialScraper:
                 unit=unit,
                 image_url=image_url,
                 in_stock=in_stock,
-                supplier="Leroy Merlin"
+                supplier="Leroy Merlin",
+                scraped_at=self._batch_scraped_at
             )
             
             return product
@@ -320,12 +515,17 @@ class MaterialScraper:
     async def scrape_all(self) -> List[Product]:
         """Scrape all configured suppliers"""
         all_products = []
+        self._batch_scraped_at = datetime.now().isoformat()
         
-        for supplier_name in self.config['suppliers'].keys():
-            logger.info(f"Starting to scrape {supplier_name}")
-            products = await self.scrape_supplier(supplier_name)
-            all_products.extend(products)
-            logger.info(f"Completed {supplier_name}: {len(products)} products")
+        try:
+            for supplier_name in self.config['suppliers'].keys():
+                logger.info(f"Starting to scrape {supplier_name}")
+                products = await self.scrape_supplier(supplier_name)
+                all_products.extend(products)
+                logger.info(f"Completed {supplier_name}: {len(products)} products")
+        finally:
+            # Products parsed outside a batch stamp themselves again
+            self._batch_scraped_at = ""
         
         self.products = all_products
         return all_products
@@ -338,41 +538,58 @@ class MaterialScraper:
         data = {
             'scraped_at': datetime.now().isoformat(),
             'total_products': len(self.products),
-            'products': [asdict(product) for product in self.products]
+            'products': [product.to_dict() for product in self.products]
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            # orjson always emits UTF-8, matching the json ensure_ascii=False output
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        
+        # Write to a temporary file in the same directory and swap it in, so
+        # readers such as the API server never see a partially written file
+        fd, tmp_path = tempfile.mkstemp(dir=Path(filepath).parent, prefix='.materials-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            # mkstemp creates files owner-only; keep the mode the file already had,
+            # or the one a plain open() would give a new file under the umask
+            try:
+                mode = os.stat(filepath).st_mode & 0o7777
+            except FileNotFoundError:
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = 0o666 & ~umask
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
         
         logger.info(f"Saved {len(self.products)} products to {filepath}")
     
     def get_summary(self) -> Dict[str, Any]:
-        """Get summary statistics of scraped data"""
+        """Get summary statistics of scraped data
+        
+        Built fresh on every call: products can be changed in place, and the
+        caller owns the returned dicts.
+        """
         if not self.products:
             return {}
         
-        categories = {}
-        suppliers = {}
-        total_value = 0
-        
-        for product in self.products:
-            # Count by category
-            categories[product.category] = categories.get(product.category, 0) + 1
-            
-            # Count by supplier
-            suppliers[product.supplier] = suppliers.get(product.supplier, 0) + 1
-            
-            # Sum total value
-            total_value += product.price
+        products = self.products
+        # Price aggregates run as NumPy reductions instead of Python-level loops
+        prices = np.fromiter((p.price for p in products), dtype=np.float64, count=len(products))
         
         return {
             'total_products': len(self.products),
-            'categories': categories,
-            'suppliers': suppliers,
-            'average_price': total_value / len(self.products) if self.products else 0,
+            'categories': dict(Counter(p.category for p in products)),
+            'suppliers': dict(Counter(p.supplier for p in products)),
+            'average_price': float(prices.mean()),
             'price_range': {
-                'min': min(p.price for p in self.products) if self.products else 0,
-                'max': max(p.price for p in self.products) if self.products else 0
+                'min': float(prices.min()),
+                'max': float(prices.max())
             }
         }
 
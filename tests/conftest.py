@@ -0,0 +1,9 @@
+"""
+Pytest configuration for Donizo Material Scraper tests
+"""
+
+import sys
+from pathlib import Path
+
+# Make the top-level scraper/api_server modules importable from tests
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Donizo Material Pricing API
+"""
+
+import unittest
+import json
+import tempfile
+import os
+
+from fastapi.testclient import TestClient
+
+from api_server import create_app
+
+
+def _product(name, category, price, brand, in_stock, supplier):
+    return {
+        "name": name,
+        "category": category,
+        "price": price,
+        "currency": "EUR",
+        "product_url": f"https://example.com/{name.lower().replace(' ', '-')}",
+        "brand": brand,
+        "in_stock": in_stock,
+        "supplier": supplier,
+        "scraped_at": "2024-01-01T00:00:00"
+    }
+
+# Shared dataset written once per test class; the last entry is missing
+# required fields and must be skipped at load time
+TEST_PRODUCTS = [
+    _product("Carrelage Céramique Blanc", "carrelage", 29.99, "Artens", True, "Leroy Merlin"),
+    _product("Carrelage Gris Mat", "carrelage", 15.0, None, False, "Leroy Merlin"),
+    _product("Lavabo Céramique", "lavabos", 120.0, "Sensea", True, "Castorama"),
+    _product("Peinture Blanche", "peinture", 45.5, "Luxens", True, "Leroy Merlin"),
+    _product("WC Suspendu", "wc", 250.0, "Sensea", False, "Castorama"),
+    {"name": "Produit Incomplet", "category": "wc"},
+]
+
+TEST_DATA = {
+    "scraped_at": "2024-01-01T00:00:00",
+    "total_products": len(TEST_PRODUCTS),
+    "products": TEST_PRODUCTS
+}
+
+
+class DataFileMixin:
+    """Write TEST_DATA to a temporary directory and serve it once per test class"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        temp_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(temp_dir.cleanup)
+        cls.temp_dir = temp_dir.name
+        cls.data_file = os.path.join(cls.temp_dir, "materials.json")
+        with open(cls.data_file, 'w', encoding='utf-8') as f:
+            json.dump(TEST_DATA, f, ensure_ascii=False)
+        cls.client = TestClient(create_app(cls.data_file))
+    
+    def _names(self, **params):
+        """Names of the /materials products matching params, in response order"""
+        response = self.client.get("/materials", params=params)
+        self.assertEqual(response.status_code, 200)
+        return [p["name"] for p in response.json()["products"]]
+
+class TestMaterialsFilters(DataFileMixin, unittest.TestCase):
+    """Test /materials filtering and pagination"""
+    
+    def test_invalid_product_skipped(self):
+        """Test products failing validation are dropped at load time"""
+        response = self.client.get("/materials").json()
+        
+        self.assertEqual(response["total"], 5)
+        self.assertNotIn("Produit Incomplet", [p["name"] for p in response["products"]])
+        self.assertEqual(self.client.get("/stats").json()["total_products"], 5)
+        self.assertEqual(self.client.get("/").json()["total_products"], 5)
+        self.assertEqual(self.client.get("/health").json()["products_loaded"], 5)
+    
+    def test_category_filter(self):
+        """Test category matches the whole value, ignoring case"""
+        test_cases = [
+            ("carrelage", ["Carrelage Céramique Blanc", "Carrelage Gris Mat"]),
+            ("CARRELAGE", ["Carrelage Céramique Blanc", "Carrelage Gris Mat"]),
+            ("carrel", []),
+            ("unknown", []),
+        ]
+        
+        for category, expected in test_cases:
+            with self.subTest(category=category):
+                self.assertEqual(self._names(category=category), expected)
+    
+    def test_supplier_filter(self):
+        """Test supplier is a case-insensitive substring match"""
+        test_cases = [
+            ("castor", ["Lavabo Céramique", "WC Suspendu"]),
+            ("MERLIN", ["Carrelage Céramique Blanc", "Carrelage Gris Mat", "Peinture Blanche"]),
+            ("brico", []),
+        ]
+        
+        for supplier, expected in test_cases:
+            with self.subTest(supplier=supplier):
+                self.assertEqual(self._names(supplier=supplier), expected)
+    
+    def test_brand_filter(self):
+        """Test brand is a case-insensitive substring match that never matches a null brand"""
+        test_cases = [
+            ("sens", ["Lavabo Céramique", "WC Suspendu"]),
+            ("ARTENS", ["Carrelage Céramique Blanc"]),
+            ("a", ["Carrelage Céramique Blanc", "Lavabo Céramique", "WC Suspendu"]),
+        ]
+        
+        for brand, expected in test_cases:
+            with self.subTest(brand=brand):
+                self.assertEqual(self._names(brand=brand), expected)
+    
+    def test_price_filters(self):
+        """Test min_price and max_price are inclusive bounds"""
+        test_cases = [
+            ({"min_price": 120}, ["Lavabo Céramique", "WC Suspendu"]),
+            ({"max_price": 29.99}, ["Carrelage Céramique Blanc", "Carrelage Gris Mat"]),
+            ({"min_price": 29.99, "max_price": 120},
+             ["Carrelage Céramique Blanc", "Lavabo Céramique", "Peinture Blanche"]),
+            ({"min_price": 300}, []),
+        ]
+        
+        for params, expected in test_cases:
+            with self.subTest(**params):
+                self.assertEqual(self._names(**params), expected)
+    
+    def test_in_stock_filter(self):
+        """Test filtering on stock status"""
+        self.assertEqual(self._names(in_stock="false"), ["Carrelage Gris Mat", "WC Suspendu"])
+        self.assertEqual(len(self._names(in_stock="true")), 3)
+    
+    def test_combined_filters(self):
+        """Test every filter applied together narrows the result"""
+        params = {"category": "carrelage", "in_stock": "true"}
+        self.assertEqual(self._names(**params), ["Carrelage Céramique Blanc"])
+        
+        params = {"supplier": "castorama", "brand": "sensea", "max_price": 200}
+        response = self.client.get("/materials", params=params).json()
+        self.assertEqual([p["name"] for p in response["products"]], ["Lavabo Céramique"])
+        self.assertEqual(response["filters_applied"], {
+            "supplier": "castorama",
+            "max_price": 200,
+            "brand": "sensea"
+        })
+    
+    def test_pagination(self):
+        """Test page slicing, including pages past the end"""
+        response = self.client.get("/materials", params={"per_page": 2, "page": 3}).json()
+        self.assertEqual([p["name"] for p in response["products"]], ["WC Suspendu"])
+        self.assertEqual(response["total"], 5)
+        self.assertEqual(response["total_pages"], 3)
+        
+        response = self.client.get("/materials", params={"per_page": 2, "page": 10}).json()
+        self.assertEqual(response["products"], [])
+        self.assertEqual(response["total"], 5)
+        self.assertEqual(response["total_pages"], 3)
+    
+    def test_product_fields(self):
+        """Test products are served with schema defaults and key order"""
+        product = self.client.get("/materials", params={"per_page": 1}).json()["products"][0]
+        
+        self.assertEqual(list(product), [
+            "name", "category", "price", "currency", "product_url", "brand", "unit",
+            "pack_size", "image_url", "in_stock", "supplier", "scraped_at"
+        ])
+        self.assertIsNone(product["unit"])
+
+class TestMaterialsSearch(DataFileMixin, unittest.TestCase):
+    """Test /materials name search"""
+    
+    def test_search(self):
+        """Test search across the short-query scan and the trigram index"""
+        test_cases = [
+            # Shorter than a trigram, so every row is scanned
+            ("GE", ["Carrelage Céramique Blanc", "Carrelage Gris Mat"]),
+            ("wc", ["WC Suspendu"]),
+            # Single trigram
+            ("mat", ["Carrelage Gris Mat"]),
+            ("LAV", ["Lavabo Céramique"]),
+            # Trigram that occurs in no name
+            ("xyz", []),
+            # Every trigram occurs, but never together as a substring
+            ("carrelage blanc", []),
+            # Non-ASCII input is lowercased like the names
+            ("CÉRAM", ["Carrelage Céramique Blanc", "Lavabo Céramique"]),
+            ("carrelage céramique blanc", ["Carrelage Céramique Blanc"]),
+        ]
+        
+        for search, expected in test_cases:
+            with self.subTest(search=search):
+                self.assertEqual(self._names(search=search), expected)
+    
+    def test_search_with_filters(self):
+        """Test search combined with other filters"""
+        test_cases = [
+            ({"search": "céramique", "category": "lavabos"}, ["Lavabo Céramique"]),
+            ({"search": "céramique", "in_stock": "false"}, []),
+            ({"search": "ue", "supplier": "castorama"}, ["Lavabo Céramique"]),
+            ({"search": "carrelage", "max_price": 20}, ["Carrelage Gris Mat"]),
+        ]
+        
+        for params, expected in test_cases:
+            with self.subTest(**params):
+                self.assertEqual(self._names(**params), expected)
+
+class TestDataValidation(unittest.TestCase):
+    """Test values are coerced at load time like the Pydantic response models do"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        temp_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(temp_dir.cleanup)
+        cls.temp_dir = temp_dir.name
+    
+    def test_string_values_coerced(self):
+        """Test numeric and boolean strings are coerced rather than skipped"""
+        product = _product("Carrelage Texte", "carrelage", "12.5", None, "false", "Leroy Merlin")
+        data_file = os.path.join(self.temp_dir, "coerced.json")
+        with open(data_file, 'w', encoding='utf-8') as f:
+            json.dump({"scraped_at": "2024-01-01T00:00:00", "products": [product]}, f)
+        
+        client = TestClient(create_app(data_file))
+        response = client.get("/materials", params={"in_stock": "false", "max_price": 20}).json()
+        
+        self.assertEqual(response["total"], 1)
+        self.assertEqual(response["products"][0]["price"], 12.5)
+        self.assertIs(response["products"][0]["in_stock"], False)
+
+class TestEmptyDataset(unittest.TestCase):
+    """Test the API serves an empty dataset when the data file is unusable"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        temp_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(temp_dir.cleanup)
+        cls.temp_dir = temp_dir.name
+    
+    def test_empty_dataset(self):
+        """Test missing and empty data files"""
+        empty_file = os.path.join(self.temp_dir, "empty.json")
+        open(empty_file, 'w').close()
+        
+        for data_file in (os.path.join(self.temp_dir, "missing.json"), empty_file):
+            with self.subTest(data_file=os.path.basename(data_file)):
+                client = TestClient(create_app(data_file))
+                
+                for params in ({}, {"category": "carrelage", "search": "carrelage"}):
+                    response = client.get("/materials", params=params).json()
+                    self.assertEqual(response["products"], [])
+                    self.assertEqual(response["total"], 0)
+                    self.assertEqual(response["total_pages"], 0)
+                
+                self.assertEqual(client.get("/stats").json()["total_products"], 0)
@@ -8,99 +8,221 @@ import asyncio
 import json
 import tempfile
 import os
-from unittest.mock import AsyncMock, MagicMock, patch
+import yaml
+from unittest.mock import MagicMock, patch
 from pathlib import Path
-import sys
 
-# Add parent directory to path to import scraper
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scraper import MaterialScraper, Product, _CONFIG_CACHE, _CONFIG_CACHE_SIZE, _load_config_cached
 
-from scraper import MaterialScraper, Product
 
+# Shared scraper config written once per test class
+TEST_CONFIG_YAML = """
+suppliers:
+  leroymerlin:
+    base_url: "https://www.leroymerlin.fr"
+    categories:
+      test_category: "/test-path"
+
+scraping:
+  delay_min: 0
+  delay_max: 0
+  max_products_per_category: 5
+  max_concurrent_requests: 1
+"""
+
+# JSON sidecar of the same config, serialized once at import; the scraper
+# reads it instead of the YAML while it is newer
+TEST_CONFIG_JSON = json.dumps(yaml.safe_load(TEST_CONFIG_YAML))
+
+
+class ConfigFileMixin:
+    """Write TEST_CONFIG_YAML and its JSON sidecar to a temporary directory once per test class"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        temp_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(temp_dir.cleanup)
+        cls.temp_dir = temp_dir.name
+        cls.config_path = os.path.join(cls.temp_dir, "test_config.yaml")
+        with open(cls.config_path, 'w') as f:
+            f.write(TEST_CONFIG_YAML)
+        json_path = os.path.join(cls.temp_dir, "test_config.json")
+        with open(json_path, 'w') as f:
+            f.write(TEST_CONFIG_JSON)
+        # Date the sidecar explicitly after the YAML instead of relying on write order
+        sidecar_mtime_ns = os.stat(cls.config_path).st_mtime_ns + 10**9
+        os.utime(json_path, ns=(sidecar_mtime_ns, sidecar_mtime_ns))
+
+class _FakeResp:
+    """Minimal stand-in for an aiohttp response used as a context manager"""
+    
+    def __init__(self, status, body=b""):
+        self.status, self._body = status, body
+    
+    async def read(self):
+        return self._body
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return None
+
+class _FakeGet:
+    """Replacement for ClientSession.get that always returns the same response"""
+    
+    def __init__(self, resp):
+        self._resp = resp
+    
+    def __call__(self, *args, **kwargs):
+        return self._resp
+
+# Built once and reused; the fakes hold no per-call state
+_GET_OK = _FakeGet(_FakeResp(200, b"<html>Test content</html>"))
+_GET_NOT_FOUND = _FakeGet(_FakeResp(404))
+
+def _listing_page(page, count):
+    """Listing page HTML with count products named P<page>-<i>"""
+    cards = "".join(
+        f'<div data-product-id="{page}-{i}"><a href="/p/{page}-{i}" title="P{page}-{i}">P{page}-{i}</a>'
+        f'<span class="price">10,00 €</span></div>'
+        for i in range(count)
+    )
+    return f"<html><body>{cards}</body></html>".encode()
+
+# Canonical products built once at import; the tests only read their fields
+_PRODUCT_MINIMAL = Product(
+    name="Carrelage Test",
+    category="carrelage",
+    price=29.99,
+    currency="EUR",
+    product_url="https://example.com/product/1",
+    supplier="Test Supplier"
+)
+
+_PRODUCT_FULL = Product(
+    name="Lavabo Premium",
+    category="lavabos",
+    price=159.99,
+    currency="EUR",
+    product_url="https://example.com/product/2",
+    brand="Brand Test",
+    unit="pièce",
+    pack_size="1",
+    image_url="https://example.com/image.jpg",
+    in_stock=False,
+    supplier="Test Supplier"
+)
 
 class TestProduct(unittest.TestCase):
     """Test Product dataclass"""
     
+    def _assert_fields(self, product, expected):
+        for field_name, value in expected.items():
+            with self.subTest(field=field_name):
+                self.assertEqual(getattr(product, field_name), value)
+    
     def test_product_creation(self):
         """Test creating a product with required fields"""
-        product = Product(
-            name="Carrelage Test",
-            category="carrelage",
-            price=29.99,
-            currency="EUR",
-            product_url="https://example.com/product/1",
-            supplier="Test Supplier"
-        )
-        
-        self.assertEqual(product.name, "Carrelage Test")
-        self.assertEqual(product.category, "carrelage")
-        self.assertEqual(product.price, 29.99)
-        self.assertEqual(product.currency, "EUR")
-        self.assertTrue(product.in_stock)
-        self.assertIsNotNone(product.scraped_at)
+        self._assert_fields(_PRODUCT_MINIMAL, {
+            'name': "Carrelage Test",
+            'category': "carrelage",
+            'price': 29.99,
+            'currency': "EUR",
+            'in_stock': True,
+        })
+        self.assertTrue(_PRODUCT_MINIMAL.scraped_at)
     
     def test_product_with_optional_fields(self):
         """Test creating a product with all fields"""
-        product = Product(
-            name="Lavabo Premium",
-            category="lavabos",
-            price=159.99,
-            currency="EUR",
-            product_url="https://example.com/product/2",
-            brand="Brand Test",
-            unit="pièce",
-            pack_size="1",
-            image_url="https://example.com/image.jpg",
-            in_stock=False,
-            supplier="Test Supplier"
-        )
-        
-        self.assertEqual(product.brand, "Brand Test")
-        self.assertEqual(product.unit, "pièce")
-        self.assertFalse(product.in_stock)
+        self._assert_fields(_PRODUCT_FULL, {
+            'brand': "Brand Test",
+            'unit': "pièce",
+            'in_stock': False,
+        })
 
 
-class TestMaterialScraper(unittest.TestCase):
+class TestMaterialScraper(ConfigFileMixin, unittest.TestCase):
     """Test MaterialScraper class"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_path = os.path.join(self.temp_dir, "test_config.yaml")
-        
-        # Create a test config file
-        test_config = """
-suppliers:
-  leroymerlin:
-    base_url: "https://www.leroymerlin.fr"
-    categories:
-      test_category: "/test-path"
-
-scraping:
-  delay_min: 0.1
-  delay_max: 0.2
-  max_products_per_category: 5
-  max_concurrent_requests: 1
-"""
-        with open(self.config_path, 'w') as f:
-            f.write(test_config)
-    
-    def tearDown(self):
-        """Clean up test fixtures"""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Scraper state used here is read-only, so one instance serves the class
+        cls.scraper = MaterialScraper(cls.config_path)
     
     def test_load_config(self):
         """Test configuration loading"""
-        scraper = MaterialScraper(self.config_path)
-        
-        self.assertIn('suppliers', scraper.config)
-        self.assertIn('leroymerlin', scraper.config['suppliers'])
+        self.assertIn('suppliers', self.scraper.config)
+        self.assertIn('leroymerlin', self.scraper.config['suppliers'])
         self.assertEqual(
-            scraper.config['scraping']['max_products_per_category'], 
+            self.scraper.config['scraping']['max_products_per_category'], 
             5
         )
     
+    def test_load_config_json_sidecar(self):
+        """Test the JSON sidecar is used only while it is strictly newer than the YAML"""
+        yaml_path = os.path.join(self.temp_dir, "sidecar_config.yaml")
+        json_path = os.path.join(self.temp_dir, "sidecar_config.json")
+        with open(yaml_path, 'w') as f:
+            f.write(TEST_CONFIG_YAML)
+        sidecar = json.loads(TEST_CONFIG_JSON)
+        sidecar['scraping']['max_products_per_category'] = 7
+        with open(json_path, 'w') as f:
+            json.dump(sidecar, f)
+        
+        yaml_mtime_ns = os.stat(yaml_path).st_mtime_ns
+        for json_offset_ns, expected in ((10**9, 7), (0, 5), (-10**9, 5)):
+            with self.subTest(json_offset_ns=json_offset_ns):
+                os.utime(json_path, ns=(yaml_mtime_ns + json_offset_ns,) * 2)
+                scraper = MaterialScraper(yaml_path)
+                self.assertEqual(scraper.config['scraping']['max_products_per_category'], expected)
+    
+    def test_load_config_returns_copies(self):
+        """Test mutating a loaded config does not leak into the next load"""
+        config = _load_config_cached(self.config_path)
+        config['scraping']['max_products_per_category'] = 999
+        config['suppliers'].clear()
+        
+        reloaded = _load_config_cached(self.config_path)
+        self.assertEqual(reloaded['scraping']['max_products_per_category'], 5)
+        self.assertIn('leroymerlin', reloaded['suppliers'])
+    
+    def test_load_config_reparses_changed_file(self):
+        """Test the cache is reused while the file is unchanged and refreshed after a rewrite"""
+        config_path = os.path.join(self.temp_dir, "changing_config.yaml")
+        with open(config_path, 'w') as f:
+            f.write("scraping:\n  delay_min: 1\n")
+        
+        with patch('scraper.yaml.load', wraps=yaml.load) as mock_load:
+            self.assertEqual(_load_config_cached(config_path)['scraping']['delay_min'], 1)
+            self.assertEqual(_load_config_cached(config_path)['scraping']['delay_min'], 1)
+            self.assertEqual(mock_load.call_count, 1)
+            
+            mtime_ns = os.stat(config_path).st_mtime_ns
+            with open(config_path, 'w') as f:
+                f.write("scraping:\n  delay_min: 20\n")
+            os.utime(config_path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+            
+            self.assertEqual(_load_config_cached(config_path)['scraping']['delay_min'], 20)
+            self.assertEqual(mock_load.call_count, 2)
+    
+    def test_load_config_cache_is_bounded(self):
+        """Test the cache keeps at most _CONFIG_CACHE_SIZE entries, evicting the oldest"""
+        paths = []
+        for i in range(_CONFIG_CACHE_SIZE + 5):
+            path = os.path.join(self.temp_dir, f"lru_config_{i}.yaml")
+            with open(path, 'w') as f:
+                f.write(f"index: {i}\n")
+            _load_config_cached(path)
+            paths.append(os.path.abspath(path))
+        
+        self.assertEqual(len(_CONFIG_CACHE), _CONFIG_CACHE_SIZE)
+        self.assertNotIn(paths[0], _CONFIG_CACHE)
+        self.assertIn(paths[-1], _CONFIG_CACHE)
+        self.assertEqual(_load_config_cached(paths[-1]), {'index': _CONFIG_CACHE_SIZE + 4})
+    
     def test_load_config_fallback(self):
         """Test fallback to default config when file not found"""
         scraper = MaterialScraper("non_existent_config.yaml")
@@ -110,8 +232,6 @@ scraping:
     
     def test_parse_price(self):
         """Test price parsing functionality"""
-        scraper = MaterialScraper(self.config_path)
-        
         # Test various price formats
         test_cases = [
             ("29,99 €", (29.99, "EUR")),
@@ -123,13 +243,11 @@ scraping:
         
         for price_text, expected in test_cases:
             with self.subTest(price_text=price_text):
-                result = scraper._parse_price(price_text)
+                result = self.scraper._parse_price(price_text)
                 self.assertEqual(result, expected)
     
     def test_extract_unit(self):
         """Test unit extraction from text"""
-        scraper = MaterialScraper(self.config_path)
-        
         test_cases = [
             ("Carrelage 60x60 cm - lot de 5 pièces", "pièce"),
             ("Peinture 2,5L blanc", "l"),
@@ -139,151 +257,272 @@ scraping:
         
         for text, expected in test_cases:
             with self.subTest(text=text):
-                result = scraper._extract_unit(text)
+                result = self.scraper._extract_unit(text)
                 if expected:
                     self.assertEqual(result.lower(), expected.lower())
                 else:
                     self.assertIsNone(result)
 
 
-class TestScrapingFunctions(unittest.IsolatedAsyncioTestCase):
+class TestScrapingFunctions(ConfigFileMixin, unittest.IsolatedAsyncioTestCase):
     """Test async scraping functions"""
     
     async def asyncSetUp(self):
-        """Async setup"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_path = os.path.join(self.temp_dir, "test_config.yaml")
-        
-        test_config = """
-suppliers:
-  leroymerlin:
-    base_url: "https://www.leroymerlin.fr"
-    categories:
-      test_category: "/test-path"
-
-scraping:
-  delay_min: 0
-  delay_max: 0
-  max_products_per_category: 5
-  max_concurrent_requests: 1
-"""
-        with open(self.config_path, 'w') as f:
-            f.write(test_config)
+        """Enter one scraper (and its pooled session) for the test"""
+        self.scraper = MaterialScraper(self.config_path)
+        await self.scraper.__aenter__()
+        self.scraper.products = []
     
     async def asyncTearDown(self):
-        """Async cleanup"""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+        """Close the test's scraper session"""
+        await self.scraper.__aexit__(None, None, None)
     
-    @patch('aiohttp.ClientSession.get')
-    async def test_fetch_page_success(self, mock_get):
-        """Test successful page fetching"""
-        # Mock successful response
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.text = AsyncMock(return_value="<html>Test content</html>")
-        mock_get.return_value.__aenter__.return_value = mock_response
-        
-        async with MaterialScraper(self.config_path) as scraper:
-            products = await scraper._scrape_leroymerlin_category("test_category", "/test-path")
+    async def test_throttle_allows_concurrent_starts(self):
+        """Test one request per slot starts immediately and the next one waits"""
+        self.scraper.config['scraping'].update(delay_min=60, delay_max=60)
+        self.scraper._request_slots = [0.0] * 3
+        
+        with patch('asyncio.sleep') as mock_sleep:
+            for _ in range(3):
+                await self.scraper._throttle()
+            mock_sleep.assert_not_called()
             
-            self.assertEqual(len(products), 2)
-            self.assertEqual(products[0].name, "Product 1")
-            self.assertEqual(products[1].name, "Product 2")
+            await self.scraper._throttle()
+            mock_sleep.assert_called_once()
+            self.assertGreater(mock_sleep.call_args.args[0], 59)
+    
+    @patch('aiohttp.ClientSession.get', _GET_OK)
+    async def test_fetch_page_success(self):
+        """Test successful page fetching"""
+        result = await self.scraper._fetch_page("https://test.com")
+        self.assertEqual(result, b"<html>Test content</html>")
+    
+    @patch('aiohttp.ClientSession.get', _GET_NOT_FOUND)
+    async def test_fetch_page_failure(self):
+        """Test failed page fetching"""
+        result = await self.scraper._fetch_page("https://test.com")
+        self.assertIsNone(result)
+    
+    @patch('scraper.MaterialScraper._fetch_page')
+    @patch('scraper.MaterialScraper._parse_leroymerlin_product')
+    async def test_scrape_leroymerlin_category(self, mock_parse_product, mock_fetch_page):
+        """Test scraping a Leroy Merlin category"""
+        # Mock HTML content with product containers
+        mock_html = b"""
+        <html>
+            <div data-product-id="1">Product 1</div>
+            <div data-product-id="2">Product 2</div>
+        </html>
+        """
+        mock_fetch_page.return_value = mock_html
+        
+        # Mock parsed products
+        mock_product1 = Product(
+            name="Product 1",
+            category="test_category",
+            price=10.0,
+            currency="EUR",
+            product_url="https://test.com/1",
+            supplier="Leroy Merlin"
+        )
+        mock_product2 = Product(
+            name="Product 2",
+            category="test_category",
+            price=20.0,
+            currency="EUR",
+            product_url="https://test.com/2",
+            supplier="Leroy Merlin"
+        )
+        
+        mock_parse_product.side_effect = [mock_product1, mock_product2]
+        
+        products = await self.scraper._scrape_leroymerlin_category("test_category", "/test-path")
+        
+        self.assertEqual(len(products), 2)
+        self.assertEqual(products[0].name, "Product 1")
+        self.assertEqual(products[1].name, "Product 2")
+    
+    async def _scrape_pages(self, pages):
+        """Scrape test_category serving pages[n] for ?page=n (None when missing)
+        
+        Returns the products and the page numbers fetched, in request order.
+        """
+        fetched = []
+        
+        async def fake_fetch_page(scraper, url):
+            page = int(url.rsplit('=', 1)[1])
+            fetched.append(page)
+            return pages.get(page)
+        
+        with patch('scraper.MaterialScraper._fetch_page', fake_fetch_page):
+            products = await self.scraper._scrape_leroymerlin_category("test_category", "/test-path")
+        return products, fetched
+    
+    async def test_pagination_stops_at_max_products(self):
+        """Test page 1 sizes the speculative batch and the result is cut at the limit"""
+        pages = {n: _listing_page(n, 2) for n in range(1, 11)}
+        
+        products, fetched = await self._scrape_pages(pages)
+        
+        # 2 products on page 1, 3 more needed -> pages 2 and 3 in one batch
+        self.assertEqual(fetched, [1, 2, 3])
+        self.assertEqual([p.name for p in products], ["P1-0", "P1-1", "P2-0", "P2-1", "P3-0"])
+    
+    async def test_pagination_stops_at_max_pages(self):
+        """Test no page past max_pages_per_category is fetched"""
+        self.scraper.config['scraping']['max_pages_per_category'] = 2
+        pages = {n: _listing_page(n, 1) for n in range(1, 11)}
+        
+        products, fetched = await self._scrape_pages(pages)
+        
+        self.assertEqual(fetched, [1, 2])
+        self.assertEqual([p.name for p in products], ["P1-0", "P2-0"])
+    
+    async def test_pagination_stops_on_failed_page(self):
+        """Test a failed fetch partway through a batch ends pagination there"""
+        pages = {1: _listing_page(1, 1), 2: _listing_page(2, 1), 4: _listing_page(4, 1)}
+        
+        products, fetched = await self._scrape_pages(pages)
+        
+        # Pages 2-5 are fetched together; page 4 and 5 are dropped after page 3 fails
+        self.assertEqual(fetched, [1, 2, 3, 4, 5])
+        self.assertEqual([p.name for p in products], ["P1-0", "P2-0"])
+    
+    async def test_pagination_stops_on_empty_page(self):
+        """Test a page without product containers ends pagination"""
+        test_cases = [
+            ({1: b"<html><body></body></html>", 2: _listing_page(2, 2)}, [1], []),
+            ({1: _listing_page(1, 2), 2: b"<html><body></body></html>", 3: _listing_page(3, 2)},
+             [1, 2, 3], ["P1-0", "P1-1"]),
+        ]
+        
+        for pages, expected_fetched, expected_names in test_cases:
+            with self.subTest(pages=sorted(pages)):
+                products, fetched = await self._scrape_pages(pages)
+                self.assertEqual(fetched, expected_fetched)
+                self.assertEqual([p.name for p in products], expected_names)
+    
+    async def test_pagination_stops_on_repeated_page(self):
+        """Test a page identical to an earlier one ends pagination"""
+        pages = {n: _listing_page(1, 2) for n in range(1, 11)}
+        
+        products, fetched = await self._scrape_pages(pages)
+        
+        self.assertEqual(fetched, [1, 2, 3])
+        self.assertEqual([p.name for p in products], ["P1-0", "P1-1"])
+    
+    async def test_scrape_all_clears_batch_timestamp(self):
+        """Test the shared batch scraped_at does not outlive scrape_all, even on error"""
+        for side_effect in ([[]], RuntimeError("boom")):
+            with self.subTest(side_effect=side_effect):
+                with patch('scraper.MaterialScraper.scrape_supplier', side_effect=side_effect):
+                    try:
+                        await self.scraper.scrape_all()
+                    except RuntimeError:
+                        pass
+                self.assertEqual(self.scraper._batch_scraped_at, "")
     
     async def test_save_data(self):
         """Test saving data to JSON file"""
-        async with MaterialScraper(self.config_path) as scraper:
-            # Add test products
-            scraper.products = [
-                Product(
-                    name="Test Product 1",
-                    category="test_category",
-                    price=99.99,
-                    currency="EUR",
-                    product_url="https://test.com/1",
-                    supplier="Test Supplier"
-                ),
-                Product(
-                    name="Test Product 2",
-                    category="test_category",
-                    price=199.99,
-                    currency="EUR",
-                    product_url="https://test.com/2",
-                    supplier="Test Supplier"
-                )
-            ]
-            
-            # Save to temp file
-            output_file = os.path.join(self.temp_dir, "test_output.json")
-            scraper.save_data(output_file)
-            
-            # Verify file was created and contains correct data
-            self.assertTrue(os.path.exists(output_file))
-            
-            with open(output_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            self.assertEqual(data['total_products'], 2)
-            self.assertEqual(len(data['products']), 2)
-            self.assertEqual(data['products'][0]['name'], "Test Product 1")
+        # Add test products
+        self.scraper.products = [
+            Product(
+                name="Test Product 1",
+                category="test_category",
+                price=99.99,
+                currency="EUR",
+                product_url="https://test.com/1",
+                supplier="Test Supplier"
+            ),
+            Product(
+                name="Test Product 2",
+                category="test_category",
+                price=199.99,
+                currency="EUR",
+                product_url="https://test.com/2",
+                supplier="Test Supplier"
+            )
+        ]
+        
+        # Save to temp file
+        output_file = os.path.join(self.temp_dir, "test_output.json")
+        self.scraper.save_data(output_file)
+        
+        # Verify file was created and contains correct data
+        self.assertTrue(os.path.exists(output_file))
+        
+        with open(output_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        self.assertEqual(data['total_products'], 2)
+        self.assertEqual(len(data['products']), 2)
+        self.assertEqual(data['products'][0]['name'], "Test Product 1")
+        # The write goes through a temporary file that is renamed into place
+        self.assertEqual([name for name in os.listdir(self.temp_dir) if name.endswith('.tmp')], [])
+    
+    async def test_save_data_file_mode(self):
+        """Test save_data keeps an existing file's mode and applies the umask to new files"""
+        self.scraper.products = [
+            Product(name="P1", category="c", price=1.0, currency="EUR", product_url="url1", supplier="S1")
+        ]
+        output_file = os.path.join(self.temp_dir, "mode_output.json")
+        
+        umask = os.umask(0o027)
+        try:
+            self.scraper.save_data(output_file)
+        finally:
+            os.umask(umask)
+        self.assertEqual(os.stat(output_file).st_mode & 0o777, 0o640)
+        
+        os.chmod(output_file, 0o600)
+        self.scraper.save_data(output_file)
+        self.assertEqual(os.stat(output_file).st_mode & 0o777, 0o600)
     
     async def test_get_summary(self):
         """Test summary statistics generation"""
-        async with MaterialScraper(self.config_path) as scraper:
-            # Add test products
-            scraper.products = [
-                Product(name="P1", category="cat1", price=10.0, currency="EUR", product_url="url1", supplier="S1"),
-                Product(name="P2", category="cat1", price=20.0, currency="EUR", product_url="url2", supplier="S1"),
-                Product(name="P3", category="cat2", price=30.0, currency="EUR", product_url="url3", supplier="S2"),
-            ]
-            
-            summary = scraper.get_summary()
-            
-            self.assertEqual(summary['total_products'], 3)
-            self.assertEqual(summary['categories']['cat1'], 2)
-            self.assertEqual(summary['categories']['cat2'], 1)
-            self.assertEqual(summary['suppliers']['S1'], 2)
-            self.assertEqual(summary['suppliers']['S2'], 1)
-            self.assertEqual(summary['average_price'], 20.0)
-            self.assertEqual(summary['price_range']['min'], 10.0)
-            self.assertEqual(summary['price_range']['max'], 30.0)
-
-
-class TestIntegration(unittest.IsolatedAsyncioTestCase):
-    """Integration tests"""
+        # Add test products
+        self.scraper.products = [
+            Product(name="P1", category="cat1", price=10.0, currency="EUR", product_url="url1", supplier="S1"),
+            Product(name="P2", category="cat1", price=20.0, currency="EUR", product_url="url2", supplier="S1"),
+            Product(name="P3", category="cat2", price=30.0, currency="EUR", product_url="url3", supplier="S2"),
+        ]
+        
+        summary = self.scraper.get_summary()
+        
+        self.assertEqual(summary['total_products'], 3)
+        self.assertEqual(summary['categories']['cat1'], 2)
+        self.assertEqual(summary['categories']['cat2'], 1)
+        self.assertEqual(summary['suppliers']['S1'], 2)
+        self.assertEqual(summary['suppliers']['S2'], 1)
+        self.assertEqual(summary['average_price'], 20.0)
+        self.assertEqual(summary['price_range']['min'], 10.0)
+        self.assertEqual(summary['price_range']['max'], 30.0)
     
-    async def asyncSetUp(self):
-        """Setup for integration tests"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_path = os.path.join(self.temp_dir, "integration_config.yaml")
+    async def test_get_summary_reflects_in_place_changes(self):
+        """Test the summary follows same-length product changes and caller mutation"""
+        self.scraper.products = [
+            Product(name="P1", category="c", price=10.0, currency="EUR", product_url="url1", supplier="S1"),
+            Product(name="P2", category="c", price=20.0, currency="EUR", product_url="url2", supplier="S1"),
+        ]
+        self.scraper.get_summary()['categories'].clear()
         
-        # Create integration test config
-        test_config = """
-suppliers:
-  leroymerlin:
-    base_url: "https://httpbin.org"  # Use httpbin for testing
-    categories:
-      test: "/html"
+        self.scraper.products[1] = Product(
+            name="P3", category="d", price=100.0, currency="EUR", product_url="url3", supplier="S1"
+        )
+        summary = self.scraper.get_summary()
+        
+        self.assertEqual(summary['average_price'], 55.0)
+        self.assertEqual(summary['categories'], {'c': 1, 'd': 1})
+        self.assertEqual(summary['price_range'], {'min': 10.0, 'max': 100.0})
 
-scraping:
-  delay_min: 0
-  delay_max: 0
-  max_products_per_category: 1
-  max_concurrent_requests: 1
-"""
-        with open(self.config_path, 'w') as f:
-            f.write(test_config)
-    
-    async def asyncTearDown(self):
-        """Cleanup integration tests"""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+
+class TestIntegration(ConfigFileMixin, unittest.IsolatedAsyncioTestCase):
+    """Integration tests"""
     
     async def test_full_scraping_workflow(self):
         """Test the complete scraping workflow with mocked data"""
         with patch('scraper.MaterialScraper._fetch_page') as mock_fetch:
-            # Mock HTML response
+            # Mock HTML response; _fetch_page returns the raw body bytes
             mock_fetch.return_value = """
             <html>
                 <div data-product-id="test1">
@@ -292,7 +531,7 @@ scraping:
                     <img src="/test.jpg" alt="test">
                 </div>
             </html>
-            """
+            """.encode('utf-8')
             
             async with MaterialScraper(self.config_path) as scraper:
                 products = await scraper.scrape_all()
@@ -307,37 +546,17 @@ scraping:
                 self.assertTrue(os.path.exists(output_file))
 
 
-class TestErrorHandling(unittest.TestCase):
+class TestErrorHandling(ConfigFileMixin, unittest.TestCase):
     """Test error handling scenarios"""
     
-    def setUp(self):
-        self.temp_dir = tempfile.mkdtemp()
-        self.config_path = os.path.join(self.temp_dir, "error_test_config.yaml")
-        
-        # Create minimal config
-        test_config = """
-suppliers:
-  leroymerlin:
-    base_url: "https://www.leroymerlin.fr"
-    categories:
-      test: "/test"
-scraping:
-  delay_min: 0
-  delay_max: 0
-  max_products_per_category: 1
-  max_concurrent_requests: 1
-"""
-        with open(self.config_path, 'w') as f:
-            f.write(test_config)
-    
-    def tearDown(self):
-        import shutil
-        shutil.rmtree(self.temp_dir)
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Scraper state used here is read-only, so one instance serves the class
+        cls.scraper = MaterialScraper(cls.config_path)
     
     def test_invalid_price_parsing(self):
         """Test handling of invalid price formats"""
-        scraper = MaterialScraper(self.config_path)
-        
         invalid_prices = [
             "abc",
             "€€€",
@@ -348,96 +567,21 @@ scraping:
         
         for invalid_price in invalid_prices:
             with self.subTest(price=invalid_price):
-                price, currency = scraper._parse_price(str(invalid_price) if invalid_price else "")
+                price, currency = self.scraper._parse_price(str(invalid_price) if invalid_price else "")
                 self.assertEqual(price, 0.0)
                 self.assertEqual(currency, "EUR")
     
     def test_malformed_html_handling(self):
         """Test parsing with malformed HTML"""
-        scraper = MaterialScraper(self.config_path)
-        
         # This should not crash the scraper
         from bs4 import BeautifulSoup
         malformed_html = "<div><span>Incomplete tag"
-        soup = BeautifulSoup(malformed_html, 'html.parser')
+        soup = BeautifulSoup(malformed_html, 'lxml')
         
         # Should handle gracefully
-        result = asyncio.run(scraper._parse_leroymerlin_product(
+        result = asyncio.run(self.scraper._parse_leroymerlin_product(
             soup, "test_category", "https://test.com"
         ))
         
         # Should return None for unparseable content
         self.assertIsNone(result)
-
-
-if __name__ == '__main__':
-    # Create test suite
-    test_classes = [
-        TestProduct,
-        TestMaterialScraper, 
-        TestScrapingFunctions,
-        TestIntegration,
-        TestErrorHandling
-    ]
-    
-    suite = unittest.TestSuite()
-    
-    for test_class in test_classes:
-        tests = unittest.TestLoader().loadTestsFromTestCase(test_class)
-        suite.addTests(tests)
-    
-    # Run tests
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(suite)
-    
-    # Exit with error code if tests failed
-    exit(0 if result.wasSuccessful() else 1)
-            result = await scraper._fetch_page("https://test.com")
-            self.assertEqual(result, "<html>Test content</html>")
-    
-    @patch('aiohttp.ClientSession.get')
-    async def test_fetch_page_failure(self, mock_get):
-        """Test failed page fetching"""
-        # Mock failed response
-        mock_response = AsyncMock()
-        mock_response.status = 404
-        mock_get.return_value.__aenter__.return_value = mock_response
-        
-        async with MaterialScraper(self.config_path) as scraper:
-            result = await scraper._fetch_page("https://test.com")
-            self.assertIsNone(result)
-    
-    @patch('scraper.MaterialScraper._fetch_page')
-    @patch('scraper.MaterialScraper._parse_leroymerlin_product')
-    async def test_scrape_leroymerlin_category(self, mock_parse_product, mock_fetch_page):
-        """Test scraping a Leroy Merlin category"""
-        # Mock HTML content with product containers
-        mock_html = """
-        <html>
-            <div data-product-id="1">Product 1</div>
-            <div data-product-id="2">Product 2</div>
-        </html>
-        """
-        mock_fetch_page.return_value = mock_html
-        
-        # Mock parsed products
-        mock_product1 = Product(
-            name="Product 1",
-            category="test_category",
-            price=10.0,
-            currency="EUR",
-            product_url="https://test.com/1",
-            supplier="Leroy Merlin"
-        )
-        mock_product2 = Product(
-            name="Product 2",
-            category="test_category",
-            price=20.0,
-            currency="EUR",
-            product_url="https://test.com/2",
-            supplier="Leroy Merlin"
-        )
-        
-        mock_parse_product.side_effect = [mock_product1, mock_product2]
-        
-        async with MaterialScraper(self.config_path) as scraper:
\ No newline at end of file